@@ -6,6 +6,10 @@ Usage:
     python scraper_v6.py [--pdf]
 
 - Downloads all chapters of the Pine Script v6 manual as HTML (cached in a "html/" directory).
+- Cached chapters are revalidated with conditional requests (ETag / Last-Modified) and only
+  downloaded again when they changed on the server.
+- Caches the Markdown converted from each chapter next to its HTML, so unchanged chapters
+  are not converted again on reruns (use --force to rebuild everything).
 - Extracts and concatenates the content into one Markdown file (preserving headers, code blocks, etc.).
 - Generates a table of contents with links to each chapter section in the Markdown.
 - If the --pdf flag is provided, converts the Markdown file to PDF.
@@ -24,12 +28,19 @@ SPDX-License-Identifier: CC0-1.0
 import os
 import re
 import sys
+import json
 import argparse
 import logging
 import requests
-from bs4 import BeautifulSoup, NavigableString
+from requests.adapters import HTTPAdapter
+import lxml.etree
+import lxml.html
+from selectolax.lexbor import LexborHTMLParser
 import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlparse
 from PIL import Image
 
@@ -37,6 +48,39 @@ from PIL import Image
 BASE_URL = "https://www.tradingview.com"
 MANUAL_INDEX_URL = BASE_URL + "/pine-script-docs"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+IMAGE_WORKERS = 8
+# PDFs below this size are not worth another Ghostscript pass.
+PDF_COMPRESS_MIN_SIZE = 2 * 1024 * 1024
+
+# The chapter pages are served as UTF-8; without an explicit encoding libxml2
+# falls back to latin-1 for pages lacking a charset declaration.
+# The same parser is reused for every chapter. Element ids are never looked up,
+# so libxml2 does not need to build its id table, and huge_tree lifts the
+# depth/size limits that would otherwise truncate very large pages.
+HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8', collect_ids=False, huge_tree=True,
+                                   no_network=True, remove_blank_text=False)
+
+SLUG_RE = re.compile(r'[^0-9a-zA-Z\s-]')
+
+# Unwanted Markdown fragments: ESLint disable/enable comments, version and theme
+# switcher leftovers, and whole lines starting with a tab.
+UNWANTED_MD_RE = re.compile(
+    r'/\* eslint-(?:dis|en)able.*\*/|VersionVersion.*|Theme\s+.*|^\t.*\n?', re.MULTILINE)
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# Markdown images pointing to .webp files: ![alt](url.webp)
+WEBP_IMAGE_RE = re.compile(r'(!\[.*?\]\()([^)]+\.webp)(\))')
+
+# Elements that never contribute to the manual text.
+SKIPPED_TAGS = frozenset(['nav', 'aside', 'header', 'footer', 'script', 'style'])
+
+# Page chrome to drop before conversion: the breadcrumb navigation at the top of
+# each page and the div holding the "On this page" table of contents.
+PAGE_CHROME_XPATH = lxml.etree.XPath(
+    '//div[@class="breadcrumb"]'
+    ' | //h2[starts-with(normalize-space(.), "On this page")]/ancestor::div[1]')
 
 
 def fix_smart_quotes(md_file: str):
@@ -57,14 +101,27 @@ def compress_pdf(pdf_file: str):
     if not gs_path:
         logging.warning("Ghostscript not found. Skipping PDF compression. Please install ghostscript.")
         return
+    if not os.path.exists(pdf_file):
+        return
+    if os.path.getsize(pdf_file) < PDF_COMPRESS_MIN_SIZE:
+        logging.info(f"{pdf_file} is already small, skipping compression")
+        return
     logging.info("Compressing manual")
+    # The manual is mostly text with embedded PNG screenshots: downsample the images
+    # to 150 dpi, subset the fonts and linearize the output for fast first-page display.
     result = subprocess.run([
         gs_path, "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.4",
-        "-dPDFSETTINGS=/ebook", "-dNOPAUSE", "-dQUIET",
+        "-dPDFSETTINGS=/screen",
+        "-dDownsampleColorImages=true", "-dColorImageResolution=150",
+        "-dDownsampleGrayImages=true", "-dGrayImageResolution=150",
+        "-dDownsampleMonoImages=true", "-dMonoImageResolution=300",
+        "-dCompressFonts=true", "-dSubsetFonts=true", "-dFastWebView=true",
+        "-dNOPAUSE", "-dQUIET",
         "-dBATCH", f"-sOutputFile={pdf_file}_compressed",
-        pdf_file])
+        pdf_file],
+        capture_output=True, text=True)
     if result.returncode != 0:
-        logging.error(f"Ghostscritp error:\n{result.stderr}")
+        logging.error(f"Ghostscript error:\n{result.stderr}")
     else:
         os.rename(pdf_file + "_compressed", pdf_file)
         logging.info(f"PDF manual compressed to {pdf_file}")
@@ -98,242 +155,346 @@ def filter_unwanted_md(text: str) -> str:
     Remove unwanted lines such as ESLint disable/enable comments,
     Version info, and Theme info.
     """
-    patterns = [
-        r"\/\* eslint-disable.*\*\/",
-        r"\/\* eslint-enable.*\*\/",
-        r"VersionVersion.*",
-        r"Theme\s+.*",
-        r"^\t.*",
-        r"^	.*"
-    ]
-    for pat in patterns:
-        text = re.sub(pat, "", text)
+    text = UNWANTED_MD_RE.sub("", text)
     # Remove multiple blank lines
-    text = re.sub(r"\n\s*\n", "\n\n", text)
-    text = "\n".join([line for line in text.split("\n") if not line.startswith("\t")])
+    text = BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
+@lru_cache(maxsize=8192)
 def slugify(text: str) -> str:
     """Convert text to a slug suitable for Markdown anchor links."""
-    slug = re.sub(r'[^0-9a-zA-Z\s-]', '', text)
+    slug = SLUG_RE.sub('', text)
     return slug.strip().lower().replace(' ', '-')
 
-def clean_html_content(html: bytes) -> bytes:
-    """Remove navigation menu and 'On this page' sections from the HTML content."""
-    content = html
-    # Remove breadcrumb navigation (the menu at the top of each page)
-    start = content.find(b'<div class="breadcrumb"')
-    if start != -1:
-        end = content.find(b'</div>', start)
-        if end != -1:
-            content = content[:start] + content[end+6:]
-    # Remove "On this page" table of contents (if any)
-    marker = b'<h2>On this page'
-    pos = content.find(marker)
-    if pos != -1:
-        div_start = content.rfind(b'<div', 0, pos)
-        div_end = content.find(b'</div>', pos)
-        if div_start != -1 and div_end != -1:
-            content = content[:div_start] + content[div_end+6:]
-    return content
-
-def element_to_md(elem, indent=0):
+@lru_cache(maxsize=8192)
+def resolve_href(href: str) -> str:
+    """
+    Resolve a link target for the Markdown output.
+    Links into the manual become in-document anchors, everything else an absolute URL.
+    """
+    full_url = href if href.startswith('http') else BASE_URL + href
+    if BASE_URL in full_url and '/pine-script-docs' in full_url:
+        if '#' in href:
+            return "#" + href.split('#', 1)[1]
+        page_slug = href.rstrip('/').split('/')[-1] or href.rstrip('/').split('/')[-2]
+        return "#" + slugify(page_slug)
+    return full_url
+
+def text_to_md(text, in_pre=False):
+    """Convert an HTML text node to Markdown, skipping pure whitespace outside <pre> blocks."""
+    if not text:
+        return ''
+    if text.isspace():
+        return text if in_pre else ''
+    return text
+
+def children_to_md(elem, indent=0, in_pre=False):
+    """
+    Convert the content of elem to Markdown in document order.
+    lxml stores the leading text in elem.text and the text following each child in child.tail.
+    """
+    parts = [text_to_md(elem.text, in_pre)]
+    for child in elem.iterchildren():
+        parts.append(element_to_md(child, indent, in_pre))
+        parts.append(text_to_md(child.tail, in_pre))
+    return "".join(parts)
+
+def element_to_md(elem, indent=0, in_pre=False):
     """
     Recursively convert HTML elements to Markdown text.
     Any <div> element with class "pine-colorizer not-content" is processed as a code block.
     """
-    if isinstance(elem, NavigableString):
-        text = str(elem)
-        # Skip pure whitespace (unless inside a pre block)
-        if text.isspace():
-            return text if elem.find_parent('pre') else ''
-        return text
-    md = ""
-    name = elem.name
-    classes = elem.get("class", [])
+    name = elem.tag
+    # Comments and processing instructions carry no content.
+    if not isinstance(name, str):
+        return ''
+    # Leftover navigation, header, footer and script elements are skipped with their whole subtree.
+    if name in SKIPPED_TAGS:
+        return ''
+    parts = []
+    classes = elem.get("class", "").split()
     # Check for the code example div and force code block formatting.
     if name == 'div' and "pine-colorizer" in classes and "not-content" in classes:
-        code_text = elem.get_text().strip()
-        md += "\n```\n" + code_text + "\n```\n\n"
-        return md
+        code_text = "".join(elem.itertext()).strip()
+        parts.append("\n```\n" + code_text + "\n```\n\n")
+        return "".join(parts)
     # Force code block for <pre> elements or code elements with newlines/long text.
-    if name == 'pre' or ("code" in classes and "\n" in elem.get_text()):
-        code_text = elem.get_text().rstrip('\n')
-        md += "\n```\n" + code_text + "\n```\n\n"
-        return md
+    # Code blocks are emitted from itertext() without recursing, so their whitespace
+    # is kept as-is and never goes through text_to_md.
+    block_text = "".join(elem.itertext()) if name == 'pre' or "code" in classes else ""
+    if name == 'pre' or "\n" in block_text:
+        code_text = block_text.rstrip('\n')
+        parts.append("\n```\n" + code_text + "\n```\n\n")
+        return "".join(parts)
     elif name == 'code':
-        code_text = elem.get_text().strip()
+        code_text = "".join(elem.itertext()).strip()
         if "\n" in code_text or len(code_text) > 80:
-            md += "\n```\n" + code_text + "\n```\n\n"
+            parts.append("\n```\n" + code_text + "\n```\n\n")
         else:
-            md += "`" + code_text + "`"
-        return md
+            parts.append("`" + code_text + "`")
+        return "".join(parts)
     elif name in ['h1','h2','h3','h4','h5','h6']:
         level = int(name[1])
-        md += "#" * level + " "
-        md += "".join(element_to_md(child, indent) for child in elem.children).strip()
-        md += "\n\n"
+        parts.append("#" * level + " ")
+        parts.append(children_to_md(elem, indent, in_pre).strip())
+        parts.append("\n\n")
     elif name in ['p','div']:
-        content = "".join(element_to_md(child, indent) for child in elem.children).strip()
+        content = children_to_md(elem, indent, in_pre).strip()
         if content:
-            md += content + "\n\n"
+            parts.append(content + "\n\n")
     elif name in ['ul','ol']:
         is_ol = (name == 'ol')
-        num = 1
-        for li in elem.find_all('li', recursive=False):
+        # iterchildren('li') filters the direct <li> children in C without an ElementPath query.
+        for num, li in enumerate(elem.iterchildren('li'), 1):
             prefix = f"{num}. " if is_ol else "- "
-            inner = "".join(element_to_md(child, indent + len(prefix)) for child in li.children).strip()
+            inner = children_to_md(li, indent + len(prefix), in_pre).strip()
             inner = inner.replace("\n", "\n" + " " * (indent + len(prefix)))
-            md += " " * indent + prefix + inner + "\n"
-            if is_ol:
-                num += 1
-        md += "\n"
+            parts.append(" " * indent + prefix + inner + "\n")
+        parts.append("\n")
     elif name == 'br':
-        md += "  \n"
+        parts.append("  \n")
     elif name == 'a':
         href = elem.get('href', '')
-        link_text = "".join(element_to_md(child, indent) for child in elem.children).strip() or ''
+        link_text = children_to_md(elem, indent, in_pre).strip() or ''
         if not href:
-            md += link_text
+            parts.append(link_text)
         else:
-            full_url = href if href.startswith('http') else BASE_URL + href
-            if BASE_URL in full_url and '/pine-script-docs' in full_url:
-                if '#' in href:
-                    frag = href.split('#', 1)[1]
-                    md += f"[{link_text}](#{frag})"
-                else:
-                    page_slug = href.rstrip('/').split('/')[-1] or href.rstrip('/').split('/')[-2]
-                    md += f"[{link_text}](#{slugify(page_slug)})"
-            else:
-                md += f"[{link_text}]({full_url})"
+            parts.append(f"[{link_text}]({resolve_href(href)})")
     elif name in ['strong','b']:
-        content = "".join(element_to_md(child, indent) for child in elem.children).strip()
-        md += f"**{content}**"
+        content = children_to_md(elem, indent, in_pre).strip()
+        parts.append(f"**{content}**")
     elif name in ['em','i']:
-        content = "".join(element_to_md(child, indent) for child in elem.children).strip()
-        md += f"*{content}*"
+        content = children_to_md(elem, indent, in_pre).strip()
+        parts.append(f"*{content}*")
     elif name == 'img':
         alt_text = elem.get('alt', '')
         src = elem.get('src', '')
         if src:
             src_url = src if src.startswith('http') else BASE_URL + src
-            md += f"![{alt_text}]({src_url})"
+            parts.append(f"![{alt_text}]({src_url})")
     else:
-        md += "".join(element_to_md(child, indent) for child in elem.children)
-    return md
+        parts.append(children_to_md(elem, indent, in_pre))
+    return "".join(parts)
 
 def extract_html_to_markdown(html: bytes) -> str:
     """Extract main content from HTML and convert it to Markdown."""
-    cleaned_html = clean_html_content(html)
-    soup = BeautifulSoup(cleaned_html, 'lxml')
-    # Remove leftover navigation, header, and footer elements
-    for tag in soup.find_all(['nav', 'aside', 'header', 'footer']):
-        tag.decompose()
-    body = soup.body or soup
-    markdown_text = "".join(element_to_md(child) for child in body.contents)
+    root = lxml.html.document_fromstring(html, parser=HTML_PARSER)
+    # Remove the breadcrumb and "On this page" sections
+    for tag in PAGE_CHROME_XPATH(root):
+        tag.drop_tree()
+    body = root.find('body')
+    if body is None:
+        body = root
+    markdown_text = children_to_md(body)
     return markdown_text.strip()
 
-def process_webp_images_in_md(md_file: str, force=False):
+def convert_webp_image(url: str, local_path: str, session) -> bool:
     """
-    Scan the Markdown file for .webp image references, convert each to PNG using Pillow,
-    store them in an 'images' directory, and update the Markdown links accordingly.
+    Convert a single .webp image (remote URL or local file) to PNG at local_path.
+    Returns True if the PNG was written.
     """
-    import re
-    os.makedirs("images", exist_ok=True)
-    with open(md_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    # Regex pattern to match Markdown images: ![alt](url.webp)
-    pattern = r'(!\[.*?\]\()([^)]+\.webp)(\))'
-    matches = re.findall(pattern, content)
-    for prefix, url, suffix in matches:
-        logging.info(f"Processing image: {url}")
-        # Determine a safe local filename from the URL.
-        parsed = urlparse(url)
-        base = os.path.basename(parsed.path)
-        local_base = os.path.splitext(base)[0] + '.png'
-        local_path = os.path.join("images", local_base)
-        if not force and os.path.exists(local_path):
-            logging.info("skipping existing file")
-            content = content.replace(url, local_path)
-            continue
+    temp_file = None
+    try:
         # If URL is remote, download it; if it's local, use it directly.
         if url.startswith("http"):
+            fd, temp_file = tempfile.mkstemp(suffix=".webp")
+            os.close(fd)
             try:
-                resp = requests.get(url, stream=True, headers=HEADERS)
-                resp.raise_for_status()
-                temp_file = "temp_image.webp"
-                with open(temp_file, "wb") as img_file:
-                    for chunk in resp.iter_content(1024):
-                        img_file.write(chunk)
+                download_file(session, url, temp_file)
             except Exception as e:
                 logging.warning(f"Failed to download {url}: {e}")
-                continue
+                return False
             source_file = temp_file
         else:
             source_file = url
             if not os.path.exists(source_file):
                 logging.warning(f"Local image {source_file} not found.")
-                continue
+                return False
         try:
-            im = Image.open(source_file).convert("RGB")
-            im.save(local_path, 'PNG')
+            with Image.open(source_file) as im:
+                im.convert("RGB").save(local_path, 'PNG')
             logging.info(f"Converted {url} to {local_path}")
-            # Update the Markdown content: replace the .webp link with local_path
-            content = content.replace(url, local_path)
+            return True
         except Exception as e:
             logging.warning(f"Failed to convert image {url}: {e}")
-        finally:
-            if url.startswith("http") and os.path.exists("temp_image.webp"):
-                os.remove("temp_image.webp")
+            return False
+    finally:
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+def process_webp_images_in_md(md_file: str, force=False, session=None):
+    """
+    Scan the Markdown file for .webp image references, convert each to PNG using Pillow,
+    store them in an 'images' directory, and update the Markdown links accordingly.
+    """
+    if session is None:
+        session = create_session()
+    os.makedirs("images", exist_ok=True)
+    with open(md_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    matches = WEBP_IMAGE_RE.findall(content)
+    # Collect url -> local_path and rewrite the Markdown in a single pass afterwards.
+    replacements = {}
+    # local_path -> urls; each PNG is converted once even if several URLs share its name.
+    targets = {}
+    for url in dict.fromkeys(url for prefix, url, suffix in matches):
+        logging.info(f"Processing image: {url}")
+        # Determine a safe local filename from the URL.
+        parsed = urlparse(url)
+        base = os.path.basename(parsed.path)
+        local_base = os.path.splitext(base)[0] + '.png'
+        local_path = os.path.join("images", local_base)
+        if not force and os.path.exists(local_path):
+            logging.info("skipping existing file")
+            replacements[url] = local_path
+            continue
+        targets.setdefault(local_path, []).append(url)
+    if targets:
+        # Pillow releases the GIL while decoding and encoding, so threads overlap
+        # both the downloads and the conversions.
+        with ThreadPoolExecutor(max_workers=min(IMAGE_WORKERS, len(targets))) as executor:
+            futures = {local_path: executor.submit(convert_webp_image, urls[0], local_path, session)
+                       for local_path, urls in targets.items()}
+        for local_path, future in futures.items():
+            if future.result():
+                for url in targets[local_path]:
+                    replacements[url] = local_path
+    if replacements:
+        # Longest URLs first so a URL that is a prefix of another one never wins.
+        urls_re = re.compile("|".join(re.escape(url) for url in sorted(replacements, key=len, reverse=True)))
+        content = urls_re.sub(lambda m: replacements[m.group(0)], content)
     with open(md_file, 'w', encoding='utf-8') as f:
         f.write(content)
 
+def create_session() -> requests.Session:
+    """Create a pooled HTTP session so all requests to the docs host reuse connections."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def download_file(session, url: str, path: str, headers=None):
+    """
+    Stream url to path in large chunks instead of buffering the whole body.
+    The data is written to a ".part" file first so an interrupted download is never mistaken for a cached one.
+    Returns the response; on a 304 Not Modified answer path is left untouched.
+    """
+    part_path = path + ".part"
+    with session.get(url, stream=True, headers=headers) as resp:
+        resp.raise_for_status()
+        if resp.status_code == 304:
+            return resp
+        # Let urllib3 undo any gzip/deflate transfer encoding while copying.
+        resp.raw.decode_content = True
+        with open(part_path, 'wb') as f:
+            shutil.copyfileobj(resp.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+    os.replace(part_path, path)
+    return resp
+
+def save_cache_validators(meta_path: str, resp):
+    """Store the ETag / Last-Modified headers of a chapter response for later conditional GETs."""
+    validators = {name: resp.headers[name] for name in ("ETag", "Last-Modified") if name in resp.headers}
+    if validators:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(validators, f)
+    elif os.path.exists(meta_path):
+        os.remove(meta_path)
+
+def load_conditional_headers(meta_path: str) -> dict:
+    """Build If-None-Match / If-Modified-Since request headers from a stored .meta.json file."""
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        validators = json.load(f)
+    headers = {}
+    if "ETag" in validators:
+        headers["If-None-Match"] = validators["ETag"]
+    if "Last-Modified" in validators:
+        headers["If-Modified-Since"] = validators["Last-Modified"]
+    return headers
+
+def fetch_chapter(idx, chapter_url, chapter_title, session, force=False):
+    """
+    Download a single chapter into the "html/" cache.
+    Cached chapters with stored validators are revalidated with a conditional GET and only
+    downloaded again when they changed. Returns (idx, file_path, chapter_title, anchor).
+    """
+    full_url = chapter_url if chapter_url.startswith('http') else BASE_URL + chapter_url
+    anchor = slugify(chapter_title)
+    safe_name = chapter_url.strip('/').replace('/', '_')
+    if not safe_name.endswith('.html'):
+        safe_name += '.html'
+    filename = f"{idx:05d}_{safe_name}"
+    file_path = os.path.join("html", filename)
+    meta_path = file_path + ".meta.json"
+    if force or not os.path.exists(file_path):
+        logging.info(f"Downloading chapter: {full_url}")
+        resp = download_file(session, full_url, file_path)
+        save_cache_validators(meta_path, resp)
+    elif os.path.exists(meta_path):
+        resp = download_file(session, full_url, file_path, load_conditional_headers(meta_path))
+        if resp.status_code == 304:
+            logging.info(f"Using cached HTML for {chapter_title} (not modified)")
+        else:
+            logging.info(f"Updated cached HTML for {chapter_title}")
+            save_cache_validators(meta_path, resp)
+    else:
+        logging.info(f"Using cached HTML for {chapter_title}")
+    return idx, file_path, chapter_title, anchor
+
+def chapter_to_markdown(file_path: str, force=False) -> str:
+    """
+    Convert a cached chapter HTML file to Markdown, with unwanted lines already filtered out.
+    The result is cached next to the HTML as "<file>.html.md" and reused while it is
+    newer than both the HTML file and this script.
+    """
+    md_cache = file_path + ".md"
+    if not force and os.path.exists(md_cache):
+        source_mtime = max(os.path.getmtime(file_path), os.path.getmtime(__file__))
+        if os.path.getmtime(md_cache) >= source_mtime:
+            with open(md_cache, 'r', encoding='utf-8') as f:
+                return f.read()
+    with open(file_path, 'rb') as f:
+        html_content = f.read()
+    md_content = filter_unwanted_md(extract_html_to_markdown(html_content))
+    with open(md_cache, 'w', encoding='utf-8') as f:
+        f.write(md_content)
+    return md_content
+
 def main(generate_pdf=False, force=False):
     os.makedirs("html", exist_ok=True)
+    session = create_session()
     logging.info(f"Fetching manual index page: {MANUAL_INDEX_URL}")
-    resp = requests.get(MANUAL_INDEX_URL, headers=HEADERS)
+    resp = session.get(MANUAL_INDEX_URL)
     resp.raise_for_status()
-    soup_index = BeautifulSoup(resp.content, 'lxml')
-    chapter_links = soup_index.find_all('a', class_='page-link')
-    chapter_links = [a for a in chapter_links if a.get('href') and '#' not in a['href']]
+    # Only the chapter links are needed from the index, so a CSS selector scan is enough.
+    tree = LexborHTMLParser(resp.content)
+    chapter_links = [(node.attributes.get('href') or '', node.text().strip())
+                     for node in tree.css('a.page-link')]
+    chapter_links = [(href, title) for href, title in chapter_links if href and '#' not in href]
     logging.info(f"Found {len(chapter_links)} chapters.")
-    combined_md_parts = []
-    toc_lines = []
-    for idx, a in enumerate(chapter_links, start=1):
-        chapter_url = a['href']
-        full_url = chapter_url if chapter_url.startswith('http') else BASE_URL + chapter_url
-        chapter_title = a.get_text().strip()
-        anchor = slugify(chapter_title)
-        toc_lines.append(f"- [{chapter_title}](#{anchor})")
-        safe_name = chapter_url.strip('/').replace('/', '_')
-        if not safe_name.endswith('.html'):
-            safe_name += '.html'
-        filename = f"{idx:05d}_{safe_name}"
-        file_path = os.path.join("html", filename)
-        if force or not os.path.exists(file_path):
-            logging.info(f"Downloading chapter: {full_url}")
-            resp_ch = requests.get(full_url, headers=HEADERS)
-            resp_ch.raise_for_status()
-            with open(file_path, 'wb') as f:
-                f.write(resp_ch.content)
-        else:
-            logging.info(f"Using cached HTML for {chapter_title}")
-        with open(file_path, 'rb') as f:
-            html_content = f.read()
-        md_content = extract_html_to_markdown(html_content)
-        combined_md_parts.append(md_content)
-    toc_md = "# Table of Contents\n\n" + "\n".join(toc_lines) + "\n\n"
-    full_md = toc_md + "\n\n".join(combined_md_parts)
-    full_md = filter_unwanted_md(full_md)
+    # Downloads are I/O bound, so overlap them on a thread pool sharing the session.
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        futures = [executor.submit(fetch_chapter, idx, chapter_url, chapter_title, session, force)
+                   for idx, (chapter_url, chapter_title) in enumerate(chapter_links, start=1)]
+        chapters = [future.result() for future in futures]
+    toc_lines = [f"- [{chapter_title}](#{anchor})" for idx, file_path, chapter_title, anchor in chapters]
+    toc_md = "# Table of Contents\n\n" + "\n".join(toc_lines)
     output_md_file = "PineScript_v6_Manual.md"
+    # Write the manual chapter by chapter instead of assembling it into one huge string.
     with open(output_md_file, 'w', encoding='utf-8') as out:
-        out.write(full_md)
+        out.write(filter_unwanted_md(toc_md))
+        # Markdown conversion is CPU bound; run it here in the original chapter order.
+        for idx, file_path, chapter_title, anchor in chapters:
+            md_content = chapter_to_markdown(file_path, force)
+            if md_content:
+                out.write("\n\n")
+                out.write(md_content)
     logging.info(f"Markdown manual saved to {output_md_file}")
 
-    # Process .webp images in the Markdown file.
-    process_webp_images_in_md(output_md_file, force)
-
     if generate_pdf:
+        # Only the LaTeX toolchain needs local PNGs; Markdown viewers render the .webp links as-is.
+        process_webp_images_in_md(output_md_file, force, session)
         pdf_file = "PineScript_v6_Manual.pdf"
         convert_md_to_pdf(output_md_file, pdf_file)
 